@@ -18,19 +18,43 @@ where
     (=the size of the resultant search tree)
 """
 
-from typing import Callable, Dict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
 import traceback
 import numpy as np
 from utils.gem_puzzle import GemPuzzleState
 
 
-def massive_test(search_function: Callable, data_path: str, *args) -> Dict:
+def _solve_one(search_function: Callable, args: Tuple, task: Tuple[int, List[int]]) -> Optional[Tuple[float, int, int]]:
+    """
+    Runs `search_function` on a single task. Returns `(len, st_size, steps)`,
+    or `None` if the search raised an error.
+    """
+    task_num, start_tile_list = task
+    goal_tile_list = list(range(1, len(start_tile_list) + 1))
+    start_state = GemPuzzleState(start_tile_list)
+    goal_state = GemPuzzleState(goal_tile_list)
+
+    try:
+        found, last_state, number_of_steps, search_tree_size = search_function(start_state, goal_state, *args)
+        return (last_state.g if found else 0.0), search_tree_size, number_of_steps
+
+    except Exception as e:
+        print(f"Task: #{task_num}. Execution error: {e}")
+        traceback.print_exc()
+        return None
+
+
+def massive_test(search_function: Callable, data_path: str, *args, max_workers: Optional[int] = 1) -> Dict:
     """
     The `massive_test` function runs the `search_function` on a set of different tasks
     (for example, from the directory `data/`) using *args as optional arguments.
 
     The function returns a dictionary containing statistics with the following keys:
-     - "len" — the length of each path (0.0 if a path wasn't found).
+     - "len" — the length of each path (0.0 if a path wasn't found). Like converting a list
+       of the lengths to an array, the dtype is integer if all lengths are integers (every
+       path was found) and float otherwise.
      - "st_size" — the size of the resultant search tree for each task.
      - "steps" — the number of algorithm steps for each task.
 
@@ -40,6 +64,10 @@ def massive_test(search_function: Callable, data_path: str, *args) -> Dict:
         The implemented search method.
     data_path : str
         Path to the directory containing tasks.
+    max_workers : Optional[int]
+        Number of processes solving tasks in parallel (`None` for all CPU cores).
+        With the default of 1 the tasks are solved sequentially in the current process.
+        Parallel runs require `search_function` and `*args` to be picklable.
 
     Returns
     -------
@@ -47,37 +75,32 @@ def massive_test(search_function: Callable, data_path: str, *args) -> Dict:
         A dictionary containing statistics.
     """
 
-    stat = {
-        "len": [],
-        "st_size": [],
-        "steps": [],
-    }
-
     with open(data_path) as tasks_file:
-        for task_num, line in enumerate(tasks_file):
-            if not line.strip():
-                continue
-
-            start_tile_list = list(map(int, line.split()))
-            goal_tile_list = list(range(1, len(start_tile_list) + 1))
-            start_state = GemPuzzleState(start_tile_list)
-            goal_state = GemPuzzleState(goal_tile_list)
-
-            try:
-                found, last_state, number_of_steps, search_tree_size = search_function(
-                    start_state, goal_state, *args
-                )
-
-                if found:
-                    stat["len"].append(last_state.g)
-                else:
-                    stat["len"].append(0.0)
+        tasks = [(task_num, list(map(int, line.split()))) for task_num, line in enumerate(tasks_file) if line.strip()]
 
-                stat["st_size"].append(search_tree_size)
-                stat["steps"].append(number_of_steps)
-
-            except Exception as e:
-                print(f"Task: #{task_num}. Execution error: {e}")
-                traceback.print_exc()
-
-    return {k: np.array(v) for k, v in stat.items()}
+    stat = {
+        "len": np.zeros(len(tasks), dtype=np.float64),
+        "st_size": np.zeros(len(tasks), dtype=np.int64),
+        "steps": np.zeros(len(tasks), dtype=np.int64),
+    }
+    solved = 0
+    integer_lengths = True
+
+    solve = partial(_solve_one, search_function, args)
+    if max_workers == 1:
+        results = map(solve, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(solve, tasks, chunksize=4))
+
+    for result in results:
+        # Tasks that raised an error are not included in the statistics
+        if result is None:
+            continue
+        stat["len"][solved], stat["st_size"][solved], stat["steps"][solved] = result
+        integer_lengths = integer_lengths and isinstance(result[0], (int, np.integer))
+        solved += 1
+
+    if solved and integer_lengths:
+        stat["len"] = stat["len"].astype(np.int64)
+    return {k: v[:solved] for k, v in stat.items()}
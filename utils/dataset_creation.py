@@ -1,8 +1,10 @@
-from random import shuffle
+from functools import lru_cache
+from random import choice, randint, shuffle
 from typing import List
 import math
+import numpy as np
 
-from utils.gem_puzzle import GemPuzzleState
+from utils.gem_puzzle import GemPuzzleState, get_successors
 
 def is_solvable(tile_list: List[int]) -> bool:
     """
@@ -21,21 +23,21 @@ def is_solvable(tile_list: List[int]) -> bool:
     bool
         Task is solvable.
     """
-    inversions = 0
-    puzzle_except_empty = [(i, v) for i, v in enumerate(tile_list) if v != len(tile_list)]
+    n = len(tile_list)
+    blank_value = n
+    size = math.isqrt(n)
 
-    for idx, (i, tile) in enumerate(puzzle_except_empty):
-        for j, next_tile in puzzle_except_empty[idx + 1 :]:
+    puzzle_except_empty = [v for v in tile_list if v != blank_value]
+    inversions = 0
+    for idx, tile in enumerate(puzzle_except_empty):
+        for next_tile in puzzle_except_empty[idx + 1 :]:
             if next_tile < tile:
                 inversions += 1
 
-    size = int(math.sqrt(len(tile_list)))
-    if size % 2 != 0 and inversions % 2 == 0:
-        return True
-    if size % 2 == 0:
-        empty_row = size - tile_list.index(len(tile_list)) // size
-        return (empty_row % 2 != 0) == (inversions % 2 == 0)
-    return False
+    if size % 2 != 0:
+        return inversions % 2 == 0
+    empty_row = size - tile_list.index(blank_value) // size
+    return (empty_row % 2 != 0) == (inversions % 2 == 0)
 
 
 def generate_random_tile_list(size: int) -> List[int]:
@@ -44,6 +46,83 @@ def generate_random_tile_list(size: int) -> List[int]:
     return tile_list
 
 
+@lru_cache(maxsize=None)
+def get_manhattan_table(size: int) -> np.ndarray:
+    """
+    Precomputes Manhattan distances to the canonical goal `[1, 2, ..., size * size]`.
+
+    Parameters
+    ----------
+    size : int
+        Width of the game field.
+
+    Returns
+    -------
+    np.ndarray
+        An `int16` array of shape `(size * size + 1, size * size)`. The entry `[tile, pos]`
+        is the Manhattan distance from position `pos` to the goal position of `tile`.
+        Row 0 is unused and the row of the blank is zero, so the blank never contributes.
+    """
+    n = size * size
+    pos = np.arange(n)
+    goal = np.arange(n + 1) - 1
+    table = np.abs(pos[None, :] // size - goal[:, None] // size) + np.abs(pos[None, :] % size - goal[:, None] % size)
+    table[0] = 0
+    table[n] = 0
+    table = table.astype(np.int16)
+    table.flags.writeable = False
+    return table
+
+
+@lru_cache(maxsize=None)
+def goal_board(size: int) -> int:
+    """
+    Packed board (see `GemPuzzleState.board`) of the canonical goal `[1, 2, ..., size * size]`.
+    Comparing `state.board` with it checks for the canonical goal without building a state.
+    """
+    return GemPuzzleState(list(range(1, size * size + 1))).board
+
+
+@lru_cache(maxsize=4)
+def _goal_positions(goal_state: GemPuzzleState) -> List[int]:
+    """
+    Positions of the tiles in the goal state, indexed by tile value.
+    States hash by their packed board, and the goal usually stays fixed for a whole search.
+    """
+    positions = [0] * (goal_state.size**2 + 1)
+    for pos, tile in enumerate(goal_state.tile_list):
+        positions[tile] = pos
+    return positions
+
+
+@lru_cache(maxsize=None)
+def _manhattan_rows(size: int) -> List[List[int]]:
+    return get_manhattan_table(size).tolist()
+
+
+def manhattan_to_canonical(tile_list: List[int], size: int) -> int:
+    """
+    Computes the Manhattan distance to the canonical goal `[1, 2, ..., size * size]`,
+    where the goal position of every tile is simply `tile - 1`.
+
+    Parameters
+    ----------
+    tile_list : List[int]
+        Tile positions.
+    size : int
+        Width of the game field.
+
+    Returns
+    ----------
+    int
+        Manhattan distance to the canonical goal.
+    """
+    # Rows of the precomputed table as plain lists: indexing them is cheaper than both
+    # the arithmetic and a NumPy gather for boards of this size. The blank's row is zero.
+    rows = _manhattan_rows(size)
+    return sum(rows[tile][pos] for pos, tile in enumerate(tile_list))
+
+
 def manhattan_distance(state1: GemPuzzleState, state2: GemPuzzleState) -> int:
     """
     Computes the Manhattan distance between two Gem Puzzle states. 
@@ -62,8 +141,11 @@ def manhattan_distance(state1: GemPuzzleState, state2: GemPuzzleState) -> int:
         Manhattan distance between two states.
     """
     size = state1.size
+    if state2.board == goal_board(size):
+        return manhattan_to_canonical(state1.tile_list, size)
+
     blank_value = len(state1.tile_list)
-    positions = {tile: pos2 for pos2, tile in enumerate(state2.tile_list) if tile != blank_value}
+    positions = _goal_positions(state2)
     dist_sum = 0
 
     for pos1, tile in enumerate(state1.tile_list):
@@ -75,6 +157,63 @@ def manhattan_distance(state1: GemPuzzleState, state2: GemPuzzleState) -> int:
     return dist_sum
 
 
+def _tiles_to_remove(goal_coords: List[int]) -> int:
+    """
+    Minimal number of tiles that have to leave a line so that the remaining tiles of the line
+    are in their goal order, i.e. the length of the line minus its longest increasing subsequence.
+    """
+    longest = [1] * len(goal_coords)
+    for i in range(len(goal_coords)):
+        for j in range(i):
+            if goal_coords[j] < goal_coords[i] and longest[j] + 1 > longest[i]:
+                longest[i] = longest[j] + 1
+    return len(goal_coords) - max(longest, default=0)
+
+
+def linear_conflict(state1: GemPuzzleState, state2: GemPuzzleState) -> int:
+    """
+    Computes the Manhattan distance enhanced with linear conflicts.
+    Two tiles are in a linear conflict if they are in the same row (column), their goal positions
+    are in that row (column) too, but they are placed in the reverse order. One of them has to leave
+    the line and come back, which costs 2 extra moves on top of the Manhattan distance.
+
+    Instead of adding 2 per conflicting pair (which overestimates when three or more tiles
+    conflict with each other), 2 moves are added for each tile that has to leave its line,
+    so the heuristic remains admissible.
+
+    Parameters
+    ----------
+    state1 : GemPuzzleState
+        Representation of the first state.
+    state2 : GemPuzzleState
+        Representation of the second state.
+
+    Returns
+    ----------
+    int
+        Manhattan distance plus linear conflicts between two states.
+    """
+    size = state1.size
+    blank_value = size**2
+    positions = _goal_positions(state2)
+    rows = [[] for _ in range(size)]
+    cols = [[] for _ in range(size)]
+
+    for pos, tile in enumerate(state1.tile_list):
+        if tile == blank_value:
+            continue
+        row, col = divmod(pos, size)
+        goal_row, goal_col = divmod(positions[tile], size)
+        # Tiles are visited in increasing order of position, so every line is ordered by the current position
+        if goal_row == row:
+            rows[row].append(goal_col)
+        if goal_col == col:
+            cols[col].append(goal_row)
+
+    conflicts = sum(_tiles_to_remove(line) for line in rows) + sum(_tiles_to_remove(line) for line in cols)
+    return manhattan_distance(state1, state2) + 2 * conflicts
+
+
 def get_manhattan_distance(tile_list: List[int]) -> int:
     goal_tile_list = list(range(1, len(tile_list) + 1))
     start_state = GemPuzzleState(tile_list)
@@ -90,9 +229,37 @@ def is_acceptable_task(tile_list: List[int], max_distance: int = 12) -> bool:
     return True
 
 
-def generate_tasks(task_file_path: str, number_of_tasks: int, size: int):
+def generate_task_by_walk(size: int, depth: int) -> List[int]:
+    """
+    Generates a task by making `depth` random moves from the goal state, never undoing
+    the previous move. The resulting task is always solvable, and both its optimal
+    solution length and its Manhattan distance do not exceed `depth`.
+
+    Parameters
+    ----------
+    size : int
+        Required size of the game field.
+    depth : int
+        Number of random moves.
+
+    Returns
+    ----------
+    List[int]
+        Tile positions of the generated task.
+    """
+    state = GemPuzzleState(list(range(1, size * size + 1)))
+    prev_blank = None
+    for _ in range(depth):
+        state, prev_blank = choice(list(get_successors(state, prev_blank=prev_blank))), state.blank_pos
+    return state.tile_list.tolist()
+
+
+def generate_tasks(task_file_path: str, number_of_tasks: int, size: int, max_distance: int = 12):
     """
     Generates number_of_tasks random tasks with specified size.
+    Each task is obtained by a random walk from the goal state of a random length
+    from 1 to max_distance (see `generate_task_by_walk`). A walk may cycle back to the goal,
+    so walks ending in the already solved state are redrawn.
 
     Parameters
     ----------
@@ -102,13 +269,16 @@ def generate_tasks(task_file_path: str, number_of_tasks: int, size: int):
         Required number of tasks to generate.
     size : int
         Required size of game fields in tasks.
+    max_distance : int
+        Maximal number of moves in the random walk.
     """
+    goal_tile_list = list(range(1, size * size + 1))
     with open(task_file_path, "a") as tasks_file:
         for _ in range(number_of_tasks):
-            tile_list = generate_random_tile_list(size)
+            tile_list = generate_task_by_walk(size, randint(1, max_distance))
 
-            while not is_acceptable_task(tile_list):
-                tile_list = generate_random_tile_list(size)
+            while tile_list == goal_tile_list:
+                tile_list = generate_task_by_walk(size, randint(1, max_distance))
 
             tasks_file.write(" ".join(map(str, tile_list)) + "\n")
             print(*tile_list, "Manhattan distance", get_manhattan_distance(tile_list))
\ No newline at end of file
@@ -1,6 +1,53 @@
-from typing import List, Optional
-import copy
-import numpy as np
+from array import array
+from functools import cached_property, lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+
+@lru_cache(maxsize=None)
+def lane_bits(size: int) -> int:
+    """
+    Number of bits used to store a single tile in the packed board of a `size` x `size` puzzle.
+    Tiles are stored as `value - 1`, so the blank occupies the largest code `size * size - 1`.
+    """
+    return max(1, (size * size - 1).bit_length())
+
+
+def _pack(tile_list: List[int], bits: int) -> int:
+    board = 0
+    for pos, tile in enumerate(tile_list):
+        board |= (tile - 1) << (bits * pos)
+    return board
+
+
+@lru_cache(maxsize=None)
+def get_neighbour_table(size: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Precomputes the positions reachable by the blank in one move.
+
+    Parameters
+    ----------
+    size : int
+        Width of the game field.
+
+    Returns
+    -------
+    Tuple[Tuple[int, ...], ...]
+        For every position on the field, the positions adjacent to it in the order
+        right, down, left, up. Corner cells have 2 neighbours and edge cells have 3.
+    """
+    delta = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+    table = []
+    for pos in range(size * size):
+        row, col = divmod(pos, size)
+        table.append(
+            tuple(
+                (row + dx) * size + col + dy
+                for dx, dy in delta
+                if 0 <= row + dx < size and 0 <= col + dy < size
+            )
+        )
+    return tuple(table)
+
 
 class GemPuzzleState:
     """
@@ -13,15 +60,19 @@ class GemPuzzleState:
     size : int
         Width of the game field.
 
-    tile_list : Optional[List[int]]
-        Tile positions represented as a list of integers from 1 to (size x size).
+    board : int
+        Tile positions packed into a single integer. The tile at position `i` occupies
+        the bit lane `[i * bits, (i + 1) * bits)` and is stored as `value - 1`, where
+        `bits` is 4 for the 8- and 15-puzzles. Copying, hashing and comparing states
+        therefore reduce to integer operations.
+
+    tile_list : array.array
+        Tile positions represented as an array of integers from 1 to (size x size).
         Each integer corresponds to a tile's value, and its index represents its position
         on the game field. The tile with the maximum value is considered the blank.
-
-    parent : GemPuzzleState
-        A pointer to the parent state. The parent is a predecessor of the state in
-        the search tree. It is used to reconstruct a path to that state from the start
-        state (the root of the search tree).
+        The array is unpacked from `board` on first access and cached. It stores tiles
+        as unsigned shorts (typecode 'H'), two bytes per tile instead of a pointer to an
+        int object per tile in a list, and still supports indexing, slicing and `index`.
 
     blank_pos : int
         The position of the empty tile in tile_list. Explicitly
@@ -40,10 +91,10 @@ class GemPuzzleState:
         """
         if tile_list is None:
             self.size: int = None
+            self.board: int = None
             self.blank_pos: int = None
             return
 
-        self.tile_list = tile_list
         self.size = int(len(tile_list) ** 0.5)
 
         if len(tile_list) != self.size**2:
@@ -51,65 +102,98 @@ class GemPuzzleState:
 
         # Finding the position of the blank tile
         blank_value = self.size**2
-        self.blank_pos = self.tile_list.index(blank_value) if blank_value in self.tile_list else -1
+        self.blank_pos = tile_list.index(blank_value) if blank_value in tile_list else -1
 
         if self.blank_pos == -1:
             raise ValueError("State should contain max value indicating the blank tile's position.")
 
+        self.board = _pack(tile_list, lane_bits(self.size))
+
+    @cached_property
+    def tile_list(self) -> array:
+        """
+        Tile positions unpacked from `board`.
+        """
+        bits = lane_bits(self.size)
+        mask = (1 << bits) - 1
+        return array("H", [((self.board >> (bits * pos)) & mask) + 1 for pos in range(self.size**2)])
+
     def __eq__(self, other) -> bool:
         """
-        Compares one state with another based on their tile lists.
+        Compares one state with another based on their packed boards.
         """
-        return hash(self) == hash(other) and self.tile_list == other.tile_list
+        if not isinstance(other, GemPuzzleState):
+            return NotImplemented
+        return self.board == other.board
 
     def __str__(self) -> str:
         """
         Return a string representation of the game field for printing.
         """
         blank_value = self.size**2
-        tile_matrix = np.array(self.tile_list).reshape(self.size, self.size)
-        result = (
-            str(tile_matrix).replace(" [", "").replace("[", "").replace("]", "").replace(str(blank_value), "_") + "\n"
-        )
-        return result
+        width = len(str(blank_value - 1))
+        rows = [
+            " ".join(
+                ("_" if tile == blank_value else str(tile)).rjust(width)
+                for tile in self.tile_list[row * self.size : (row + 1) * self.size]
+            )
+            for row in range(self.size)
+        ]
+        return "\n".join(rows) + "\n"
 
     def __hash__(self):
-        return hash(str(self.tile_list))
+        """
+        Hashes the packed board. Unlike hashing a string of the tile list,
+        this does not allocate anything.
+        """
+        return hash(self.board)
+
+
+def _make_child(state: GemPuzzleState, board: int, blank_pos: int) -> GemPuzzleState:
+    """
+    Creates a successor of `state` directly from its packed board, bypassing the
+    checks performed by the constructor.
+    """
+    child = GemPuzzleState.__new__(GemPuzzleState)
+    child.size = state.size
+    child.board = board
+    child.blank_pos = blank_pos
+    return child
 
 
-def get_successors(state: GemPuzzleState) -> List[GemPuzzleState]:
+def get_successors(state: GemPuzzleState, prev_blank: Optional[int] = None) -> Iterator[GemPuzzleState]:
     """
     Implementing the `get_successors` function is another crucial step in tackling any search problem.
-    This function is designed to take a specific search state as input and return all possible successor states,
+    This function is designed to take a specific search state as input and yield all possible successor states,
     which result from applying all applicable actions to the input state. In the case of GemPuzzle, the successors
     correspond to the board states resulting from moving the blank tile up, down, left, or right. If the blank tile
-    goes out of the field after a move, such a successor should be discarded.
+    goes out of the field after a move, such a successor should be discarded. If `prev_blank` is given, the move
+    that returns the blank to that position (i.e., undoes the move leading to `state`) is discarded as well.
 
     Parameters
     ----------
     state : GemPuzzleState
         The input search state.
-
-    Returns
-    -------
-    List[GemPuzzleState]
-        A list containing all possible successor states for the input state.
+    prev_blank : Optional[int]
+        Position of the blank in the predecessor of `state`. By default all legal moves are generated.
+
+    Yields
+    ------
+    GemPuzzleState
+        Possible successor states for the input state. Successors are created lazily,
+        so the ones that are not consumed (e.g., after a cutoff) are never built.
     """
-    successors = []
-    delta = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-    for dx, dy in delta:
-        row = state.blank_pos // state.size
-        col = state.blank_pos % state.size
-        row += dx
-        col += dy
-
-        if 0 <= row < state.size and 0 <= col < state.size:
-            new_state = GemPuzzleState()
-            new_state.size = state.size
-            new_state.tile_list = copy.copy(state.tile_list)
-            new_state.blank_pos = row * state.size + col
-            new_state.tile_list[state.blank_pos] = new_state.tile_list[new_state.blank_pos]
-            new_state.tile_list[new_state.blank_pos] = state.size**2
-            successors.append(new_state)
-
-    return successors
+    bits = lane_bits(state.size)
+    mask = (1 << bits) - 1
+    blank_code = state.size**2 - 1
+    blank_shift = bits * state.blank_pos
+    for new_blank in get_neighbour_table(state.size)[state.blank_pos]:
+        if new_blank == prev_blank:
+            continue
+
+        shift = bits * new_blank
+        tile = (state.board >> shift) & mask
+        # Swapping the blank with the moved tile: XOR-ing both lanes with their
+        # difference turns one value into the other.
+        diff = tile ^ blank_code
+        yield _make_child(state, state.board ^ (diff << shift) ^ (diff << blank_shift), new_blank)
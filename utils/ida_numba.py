@@ -0,0 +1,188 @@
+"""
+IDA* for the Gem Puzzle compiled with Numba.
+
+The whole recursive search works on packed boards (see `GemPuzzleState.board`) stored in
+a `uint64`, with the Manhattan heuristic and successor generation driven by the tables from
+`utils.dataset_creation` and `utils.gem_puzzle`. `GemPuzzleState` is only used at the boundary,
+so `idastar_numba` can be passed to `massive_test` like any other search function:
+
+```
+massive_test(idastar_numba, "data/tasks_gem.txt")
+```
+
+Boards wider than 64 bits (5x5 and larger) do not fit into a `uint64` and are not supported.
+"""
+
+from typing import List, NamedTuple, Optional, Tuple
+import numpy as np
+from numba import njit
+
+from utils.dataset_creation import get_manhattan_table, goal_board
+from utils.gem_puzzle import GemPuzzleState, lane_bits, get_neighbour_table
+
+_INF = np.int64(1) << np.int64(62)
+
+
+class SearchNode(NamedTuple):
+    """
+    Last node of the path found by `idastar_numba`.
+
+    Attributes
+    ----------
+    state : GemPuzzleState
+        The goal state.
+    g : int
+        Length of the path.
+    path : List[int]
+        Positions of the blank along the path, starting from the start state.
+        The intermediate states can be reconstructed by replaying these moves.
+    """
+
+    state: GemPuzzleState
+    g: int
+    path: List[int]
+
+
+@njit(cache=True)
+def tile_at(board, pos, bits):
+    """
+    Returns the code (`value - 1`) of the tile at `pos`.
+    """
+    mask = np.uint64((1 << bits) - 1)
+    return np.int64((board >> np.uint64(bits * pos)) & mask)
+
+
+@njit(cache=True)
+def md_h(board, md_table, bits):
+    """
+    Manhattan distance of a packed board to the canonical goal.
+    `md_table` is indexed by tile code and position.
+    """
+    h = 0
+    for pos in range(md_table.shape[1]):
+        h += md_table[tile_at(board, pos, bits), pos]
+    return h
+
+
+@njit(cache=True)
+def move(board, blank, new_blank, bits):
+    """
+    Moves the blank from `blank` to `new_blank`. Returns the new board and the code of the moved tile.
+    """
+    blank_code = tile_at(board, blank, bits)
+    tile = tile_at(board, new_blank, bits)
+    diff = np.uint64(tile ^ blank_code)
+    new_board = board ^ (diff << np.uint64(bits * new_blank)) ^ (diff << np.uint64(bits * blank))
+    return new_board, tile
+
+
+@njit(cache=True)
+def search(board, blank, g, h, bound, goal, md_table, neighbour_table, last_blank, bits, path, nodes):
+    """
+    IDA* recursive procedure.
+
+    Returns `(found, value)`: the path length if the goal was reached, otherwise the
+    minimal f-value exceeding `bound`. Blank positions along the current path are written
+    to `path[0..g]`, and `nodes[0]` counts the number of calls.
+
+    `h` is the Manhattan distance of `board`. It is never recomputed from scratch: a move changes
+    the position of exactly one tile, so the child's h is derived from the parent's by two table
+    lookups. This is the only place where the incremental update is done; `get_successors`
+    generates plain states.
+    """
+    nodes[0] += 1
+    f = g + h
+    if f > bound:
+        return False, f
+
+    path[g] = blank
+    if board == goal:
+        return True, g
+
+    next_bound = _INF
+    # A move changes h by exactly 1, so ordering successors by h means trying the moves that
+    # decrease h in the first pass and the rest in the second one. All successors share the
+    # same g, so the ones with smaller f are tried first and the goal is reached earlier.
+    for improving in (True, False):
+        for k in range(neighbour_table.shape[1]):
+            new_blank = neighbour_table[blank, k]
+            if new_blank < 0:
+                break
+            if new_blank == last_blank:
+                continue
+
+            new_board, tile = move(board, blank, new_blank, bits)
+            new_h = h - md_table[tile, new_blank] + md_table[tile, blank]
+            if (new_h < h) != improving:
+                continue
+
+            found, value = search(
+                new_board, new_blank, g + 1, new_h, bound, goal, md_table, neighbour_table, blank, bits, path, nodes
+            )
+            if found:
+                return True, value
+            if value < next_bound:
+                next_bound = value
+
+    return False, next_bound
+
+
+def _tables(size: int) -> Tuple[np.ndarray, np.ndarray]:
+    n = size * size
+    # Rows of the Manhattan table are shifted to be indexed by tile codes instead of values.
+    md_table = get_manhattan_table(size)[1:].astype(np.int64)
+    neighbour_table = np.full((n, 4), -1, dtype=np.int64)
+    for pos, neighbours in enumerate(get_neighbour_table(size)):
+        neighbour_table[pos, : len(neighbours)] = neighbours
+    return md_table, neighbour_table
+
+
+def idastar_numba(
+    start_state: GemPuzzleState, goal_state: GemPuzzleState
+) -> Tuple[bool, Optional[SearchNode], int, int]:
+    """
+    IDA* with the Manhattan heuristic, compiled with Numba.
+    The goal should be the canonical state `[1, 2, ..., size * size]`.
+
+    Parameters
+    ----------
+    start_state : GemPuzzleState
+        Start state.
+    goal_state : GemPuzzleState
+        Goal state.
+
+    Returns
+    -------
+    Tuple[bool, Optional[SearchNode], int, int]
+        Path found flag, last node of the path (`None` if a path wasn't found), the number
+        of search steps and the size of the search tree at the final iteration.
+    """
+    size = start_state.size
+    bits = lane_bits(size)
+    if bits * size * size > 64:
+        raise ValueError("Boards larger than 64 bits are not supported.")
+    if goal_state.board != goal_board(size):
+        raise ValueError("Goal state should be the canonical one.")
+
+    md_table, neighbour_table = _tables(size)
+    board = np.uint64(start_state.board)
+    goal = np.uint64(goal_state.board)
+    blank = np.int64(start_state.blank_pos)
+    h = md_h(board, md_table, bits)
+
+    bound = h
+    nodes = np.zeros(1, dtype=np.int64)
+    path = np.empty(0, dtype=np.int64)
+    while True:
+        if path.size <= bound:
+            path = np.empty(2 * bound + 1, dtype=np.int64)
+
+        found, value = search(board, blank, 0, h, bound, goal, md_table, neighbour_table, -1, bits, path, nodes)
+        if found:
+            break
+        if value == _INF:
+            return False, None, int(nodes[0]), 1
+        bound = value
+
+    # The compiled search only stops at a board equal to the goal
+    return True, SearchNode(goal_state, int(value), path[: value + 1].tolist()), int(nodes[0]), int(value) + 1
@@ -0,0 +1,116 @@
+"""
+Pattern database (PDB) heuristic for the Gem Puzzle.
+
+A pattern database stores the exact number of moves needed to bring a subset of tiles (the pattern)
+and the blank to their goal positions, ignoring all the other tiles. Since every move of the real
+puzzle is also a move of this abstraction, the stored values never overestimate the real distance.
+The database is built once by a breadth-first search backwards from the goal and then each
+heuristic evaluation is a single array lookup.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import List, Tuple
+import numpy as np
+
+from utils.dataset_creation import goal_board, manhattan_distance
+from utils.gem_puzzle import GemPuzzleState, get_neighbour_table
+
+UNREACHED = 255
+DEFAULT_PATTERN = (1, 2, 3, 4)
+
+
+def _rank(positions: List[int], n: int) -> int:
+    """
+    Index of an abstract state in the database: positions of the blank and of the pattern tiles
+    read as digits of a number in base `n`.
+    """
+    index = 0
+    for pos in positions:
+        index = index * n + pos
+    return index
+
+
+@lru_cache(maxsize=None)
+def build_pdb(size: int, pattern: Tuple[int, ...] = DEFAULT_PATTERN) -> np.ndarray:
+    """
+    Builds a pattern database for the canonical goal `[1, 2, ..., size * size]`.
+
+    Parameters
+    ----------
+    size : int
+        Width of the game field.
+    pattern : Tuple[int, ...]
+        Tiles tracked by the database: distinct values from 1 to `size * size - 1` (the blank
+        is always tracked). The default pattern has 524160 abstract states on the 15-puzzle
+        and takes about a second to build.
+
+    Returns
+    -------
+    np.ndarray
+        A `uint8` array of `n ** (len(pattern) + 1)` entries, `n = size * size`, indexed by `_rank`
+        of `[blank_pos, pos_of_pattern[0], ...]`. Unreachable entries are set to `UNREACHED`.
+    """
+    n = size * size
+    if len(set(pattern)) != len(pattern) or not all(1 <= tile < n for tile in pattern):
+        raise ValueError("Pattern tiles should be distinct values from 1 to size * size - 1.")
+
+    neighbours = get_neighbour_table(size)
+    pdb = bytearray([UNREACHED]) * (n ** (len(pattern) + 1))
+
+    goal = [n - 1] + [tile - 1 for tile in pattern]
+    pdb[_rank(goal, n)] = 0
+    queue = deque([goal])
+    while queue:
+        positions = queue.popleft()
+        depth = pdb[_rank(positions, n)]
+        blank_pos = positions[0]
+        for new_blank in neighbours[blank_pos]:
+            next_positions = positions.copy()
+            next_positions[0] = new_blank
+            # A pattern tile at the new blank position moves to the old one
+            for i in range(1, len(positions)):
+                if positions[i] == new_blank:
+                    next_positions[i] = blank_pos
+                    break
+
+            index = _rank(next_positions, n)
+            if pdb[index] == UNREACHED:
+                pdb[index] = depth + 1
+                queue.append(next_positions)
+
+    return np.frombuffer(bytes(pdb), dtype=np.uint8)
+
+
+def pdb_heuristic(state1: GemPuzzleState, state2: GemPuzzleState) -> int:
+    """
+    The maximum of the Manhattan distance and the pattern database value
+    for the default pattern (restricted to the tiles present on the board).
+    Both are admissible, so is their maximum. The database is built on the first call.
+
+    Parameters
+    ----------
+    state1 : GemPuzzleState
+        Representation of the first state.
+    state2 : GemPuzzleState
+        Representation of the second state. Should be the canonical goal.
+
+    Returns
+    ----------
+    int
+        Heuristic estimate of the distance between two states.
+    """
+    size = state1.size
+    n = size * size
+    if state2.board != goal_board(size):
+        raise ValueError("Pattern database heuristic supports only the canonical goal.")
+
+    pattern = tuple(tile for tile in DEFAULT_PATTERN if tile < n)
+    pdb = build_pdb(size, pattern)
+    tile_list = state1.tile_list
+    positions = [state1.blank_pos] + [tile_list.index(tile) for tile in pattern]
+    value = int(pdb[_rank(positions, n)])
+    # Abstract states unreachable from the goal belong to unsolvable tasks; fall back to Manhattan there
+    if value == UNREACHED:
+        value = 0
+    return max(manhattan_distance(state1, state2), value)